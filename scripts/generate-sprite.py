@@ -10,10 +10,20 @@ Row 2: sleeping   - slumped on desk, Zzz
 Row 3: celebrating - arms up, sparkles
 Row 4: worried    - sweat drops, hunched
 Row 5: warmup     - monitors turning on, stretching
+
+Requires Pillow and NumPy. Pillow-SIMD is a drop-in replacement for
+Pillow with faster image ops and PNG filtering, and works without code
+changes:
+
+    pip uninstall pillow && pip install pillow-simd
 """
 
-from PIL import Image, ImageDraw
+from collections import namedtuple
+from PIL import Image
+import numpy as np
 import base64
+import hashlib
+import io
 import sys
 import os
 
@@ -21,214 +31,309 @@ W, H = 64, 64
 COLS, ROWS = 6, 6
 SHEET_W, SHEET_H = W * COLS, H * ROWS
 
+# Pixels are packed little-endian RGBA uint32 values, so one store writes a
+# whole pixel and a uint32 frame reinterprets directly as RGBA bytes.
+PIXEL = np.dtype('<u4')
+
+
+def pack(r, g, b, a):
+    """Pack an RGBA colour into a single uint32 pixel value."""
+    return r | (g << 8) | (b << 16) | (a << 24)
+
+
+def with_alpha(color, alpha):
+    """Return a packed colour with its alpha replaced."""
+    return (color & 0xFFFFFF) | (alpha << 24)
+
+
 # Color palette (brighter for dark dashboard background #111a2b)
-TRANSPARENT = (0, 0, 0, 0)
-SKIN = (255, 210, 170, 255)
-SKIN_SHADOW = (230, 180, 140, 255)
-HAIR = (90, 60, 40, 255)
-HOODIE = (100, 130, 200, 255)
-HOODIE_DARK = (75, 100, 170, 255)
-HOODIE_LIGHT = (130, 160, 220, 255)
-DESK = (160, 120, 80, 255)
-DESK_TOP = (185, 145, 100, 255)
-DESK_DARK = (130, 95, 65, 255)
-CHAIR = (90, 90, 110, 255)
-CHAIR_BACK = (105, 105, 125, 255)
-MONITOR_FRAME = (70, 75, 95, 255)
-MONITOR_SCREEN = (30, 45, 75, 255)
-MONITOR_GREEN = (16, 220, 150, 255)
-MONITOR_BLUE = (80, 150, 255, 255)
-MONITOR_RED = (255, 90, 90, 255)
-SCREEN_LINE = (100, 150, 200, 220)
-EYE_WHITE = (255, 255, 255, 255)
-EYE_PUPIL = (40, 30, 25, 255)
-MOUTH = (200, 120, 100, 255)
-ZZZ = (170, 190, 240, 230)
-SPARKLE = (255, 230, 110, 255)
-SWEAT = (160, 220, 255, 240)
-OUTLINE = (50, 40, 35, 255)
-
-
-def px(draw, x, y, color):
+SKIN = pack(255, 210, 170, 255)
+SKIN_SHADOW = pack(230, 180, 140, 255)
+HAIR = pack(90, 60, 40, 255)
+HOODIE = pack(100, 130, 200, 255)
+HOODIE_DARK = pack(75, 100, 170, 255)
+HOODIE_LIGHT = pack(130, 160, 220, 255)
+DESK = pack(160, 120, 80, 255)
+DESK_TOP = pack(185, 145, 100, 255)
+DESK_DARK = pack(130, 95, 65, 255)
+CHAIR = pack(90, 90, 110, 255)
+CHAIR_BACK = pack(105, 105, 125, 255)
+MONITOR_FRAME = pack(70, 75, 95, 255)
+MONITOR_SCREEN = pack(30, 45, 75, 255)
+MONITOR_GREEN = pack(16, 220, 150, 255)
+MONITOR_BLUE = pack(80, 150, 255, 255)
+MONITOR_RED = pack(255, 90, 90, 255)
+SCREEN_LINE = pack(100, 150, 200, 220)
+EYE_WHITE = pack(255, 255, 255, 255)
+EYE_PUPIL = pack(40, 30, 25, 255)
+MOUTH = pack(200, 120, 100, 255)
+MOUTH_DARK = pack(100, 50, 40, 255)
+ZZZ = pack(170, 190, 240, 230)
+SPARKLE = pack(255, 230, 110, 255)
+SWEAT = pack(160, 220, 255, 240)
+OUTLINE = pack(50, 40, 35, 255)
+
+
+def px(buf, x, y, color):
     """Draw a single pixel."""
-    if 0 <= x < W and 0 <= y < H and color[3] > 0:
-        draw.point((x, y), fill=color)
+    if 0 <= x < W and 0 <= y < H and color >> 24:
+        buf[y, x] = color
 
 
-def rect(draw, x, y, w, h, color):
-    """Draw a filled rectangle."""
-    for dy in range(h):
-        for dx in range(w):
-            px(draw, x + dx, y + dy, color)
+def rect(buf, x, y, w, h, color):
+    """Draw a filled rectangle, clipped to the frame once up front."""
+    if not color >> 24:
+        return
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, W), min(y + h, H)
+    if x0 < x1 and y0 < y1:
+        buf[y0:y1, x0:x1] = color
 
 
-def draw_desk(draw):
+def stamp(buf, xs, ys, color):
+    """Draw the pixels at coordinate arrays xs/ys, clipped to the frame."""
+    if not color >> 24:
+        return
+    keep = (0 <= xs) & (xs < W) & (0 <= ys) & (ys < H)
+    buf[ys[keep], xs[keep]] = color
+
+
+def draw_desk(buf):
     """Draw the desk - bottom portion of frame."""
     # Desk top surface
-    rect(draw, 8, 44, 48, 3, DESK_TOP)
+    rect(buf, 8, 44, 48, 3, DESK_TOP)
     # Desk front
-    rect(draw, 8, 47, 48, 8, DESK)
+    rect(buf, 8, 47, 48, 8, DESK)
     # Desk shadow line
-    rect(draw, 8, 47, 48, 1, DESK_DARK)
+    rect(buf, 8, 47, 48, 1, DESK_DARK)
     # Desk legs
-    rect(draw, 10, 55, 3, 9, DESK_DARK)
-    rect(draw, 51, 55, 3, 9, DESK_DARK)
+    rect(buf, 10, 55, 3, 9, DESK_DARK)
+    rect(buf, 51, 55, 3, 9, DESK_DARK)
 
 
-def draw_chair(draw):
+def draw_chair(buf):
     """Draw the chair behind character."""
     # Chair back
-    rect(draw, 24, 28, 16, 2, CHAIR_BACK)
-    rect(draw, 23, 30, 1, 12, CHAIR_BACK)
-    rect(draw, 40, 30, 1, 12, CHAIR_BACK)
+    rect(buf, 24, 28, 16, 2, CHAIR_BACK)
+    rect(buf, 23, 30, 1, 12, CHAIR_BACK)
+    rect(buf, 40, 30, 1, 12, CHAIR_BACK)
+
+
+# Monitor chart pixels as coordinate arrays for stamp()
+CHART_LINE = np.array([3, 2, 4, 1, 3, 2, 5, 3, 1, 2])
+LINE_X = 13 + np.arange(len(CHART_LINE))
+LINE_Y = 35 + CHART_LINE
+LINE_FLICKER = np.arange(len(CHART_LINE)) % 3 != 0
+CANDLES = [4, 6, 3, 7, 5]
+
+
+def _candle_pixels(tall):
+    """Return x/y arrays covering the candles taller than 4px (or the rest)."""
+    points = [(41 + i * 2, 38 - h_val + dy)
+              for i, h_val in enumerate(CANDLES) if (h_val > 4) == tall
+              for dy in range(h_val)]
+    xs, ys = np.array(points).T
+    return xs, ys
+
 
+CANDLE_X, CANDLE_Y = _candle_pixels(True)
+CANDLE_DIM_X, CANDLE_DIM_Y = _candle_pixels(False)
 
-def draw_monitors(draw, left_glow=MONITOR_BLUE, right_glow=MONITOR_GREEN, flicker=0):
+
+def draw_monitors(buf, left_glow=MONITOR_BLUE, right_glow=MONITOR_GREEN, flicker=0):
     """Draw two monitors on the desk."""
     # Left monitor
-    rect(draw, 11, 30, 14, 12, MONITOR_FRAME)
-    rect(draw, 12, 31, 12, 10, MONITOR_SCREEN)
+    rect(buf, 11, 30, 14, 12, MONITOR_FRAME)
+    rect(buf, 12, 31, 12, 10, MONITOR_SCREEN)
     # Monitor stand
-    rect(draw, 16, 42, 4, 2, MONITOR_FRAME)
+    rect(buf, 16, 42, 4, 2, MONITOR_FRAME)
 
     # Right monitor
-    rect(draw, 39, 30, 14, 12, MONITOR_FRAME)
-    rect(draw, 40, 31, 12, 10, MONITOR_SCREEN)
+    rect(buf, 39, 30, 14, 12, MONITOR_FRAME)
+    rect(buf, 40, 31, 12, 10, MONITOR_SCREEN)
     # Monitor stand
-    rect(draw, 44, 42, 4, 2, MONITOR_FRAME)
+    rect(buf, 44, 42, 4, 2, MONITOR_FRAME)
 
     # Screen content - chart lines
     if flicker != 2:  # not off
-        # Left screen - green line chart
-        for i in range(10):
-            y_off = [3, 2, 4, 1, 3, 2, 5, 3, 1, 2][i]
-            if flicker == 1 and i % 3 == 0:
-                continue
-            px(draw, 13 + i, 35 + y_off, left_glow)
-            px(draw, 13 + i, 36 + y_off, (*left_glow[:3], 80))
-
-        # Right screen - candles
-        for i in range(5):
-            h_val = [4, 6, 3, 7, 5][i]
-            c = right_glow if h_val > 4 else ((*right_glow[:3], 150))
-            rect(draw, 41 + i * 2, 38 - h_val, 1, h_val, c)
-
-
-def draw_body_sitting(draw, y_off=0, arms='desk'):
+        # Left screen - line chart with a faint trail below it; flicker
+        # drops every third point
+        on = LINE_FLICKER if flicker == 1 else slice(None)
+        stamp(buf, LINE_X[on], LINE_Y[on], left_glow)
+        stamp(buf, LINE_X[on], LINE_Y[on] + 1, with_alpha(left_glow, 80))
+
+        # Right screen - candles, short ones dimmed
+        stamp(buf, CANDLE_X, CANDLE_Y, right_glow)
+        stamp(buf, CANDLE_DIM_X, CANDLE_DIM_Y, with_alpha(right_glow, 150))
+
+
+def _arms_desk(buf, y):
+    # Arms on desk - reaching toward keyboard area
+    rect(buf, 24, 42 + y, 4, 2, HOODIE)
+    rect(buf, 36, 42 + y, 4, 2, HOODIE)
+    # Hands
+    rect(buf, 23, 42 + y, 2, 2, SKIN)
+    rect(buf, 39, 42 + y, 2, 2, SKIN)
+
+
+def _arms_up(buf, y):
+    # Arms raised in celebration
+    rect(buf, 23, 33 + y, 3, 2, HOODIE)
+    rect(buf, 38, 33 + y, 3, 2, HOODIE)
+    rect(buf, 22, 31 + y, 2, 3, HOODIE)
+    rect(buf, 40, 31 + y, 2, 3, HOODIE)
+    # Hands up
+    rect(buf, 22, 30 + y, 2, 2, SKIN)
+    rect(buf, 40, 30 + y, 2, 2, SKIN)
+
+
+def _arms_typing_l(buf, y):
+    # Left hand raised, right on desk
+    rect(buf, 24, 40 + y, 4, 2, HOODIE)
+    rect(buf, 36, 42 + y, 4, 2, HOODIE)
+    rect(buf, 23, 40 + y, 2, 2, SKIN)
+    rect(buf, 39, 42 + y, 2, 2, SKIN)
+
+
+def _arms_typing_r(buf, y):
+    # Right hand raised, left on desk
+    rect(buf, 24, 42 + y, 4, 2, HOODIE)
+    rect(buf, 36, 40 + y, 4, 2, HOODIE)
+    rect(buf, 23, 42 + y, 2, 2, SKIN)
+    rect(buf, 39, 40 + y, 2, 2, SKIN)
+
+
+def _arms_slumped(buf, y):
+    # Arms flat on desk (sleeping)
+    rect(buf, 22, 43 + y, 6, 2, HOODIE)
+    rect(buf, 36, 43 + y, 6, 2, HOODIE)
+    rect(buf, 21, 43 + y, 2, 2, SKIN)
+    rect(buf, 41, 43 + y, 2, 2, SKIN)
+
+
+BODY_VARIANTS = {
+    'desk': _arms_desk,
+    'up': _arms_up,
+    'typing_l': _arms_typing_l,
+    'typing_r': _arms_typing_r,
+    'slumped': _arms_slumped,
+}
+
+
+def draw_body_sitting(buf, y_off=0, arms='desk'):
     """Draw character body sitting at desk."""
     y = y_off
 
     # Hoodie body (torso)
-    rect(draw, 27, 36 + y, 10, 8, HOODIE)
-    rect(draw, 26, 37 + y, 1, 6, HOODIE_DARK)
-    rect(draw, 37, 37 + y, 1, 6, HOODIE_DARK)
+    rect(buf, 27, 36 + y, 10, 8, HOODIE)
+    rect(buf, 26, 37 + y, 1, 6, HOODIE_DARK)
+    rect(buf, 37, 37 + y, 1, 6, HOODIE_DARK)
     # Hoodie middle line
-    rect(draw, 32, 37 + y, 1, 7, HOODIE_DARK)
-
-    if arms == 'desk':
-        # Arms on desk - reaching toward keyboard area
-        rect(draw, 24, 42 + y, 4, 2, HOODIE)
-        rect(draw, 36, 42 + y, 4, 2, HOODIE)
-        # Hands
-        rect(draw, 23, 42 + y, 2, 2, SKIN)
-        rect(draw, 39, 42 + y, 2, 2, SKIN)
-    elif arms == 'up':
-        # Arms raised in celebration
-        rect(draw, 23, 33 + y, 3, 2, HOODIE)
-        rect(draw, 38, 33 + y, 3, 2, HOODIE)
-        rect(draw, 22, 31 + y, 2, 3, HOODIE)
-        rect(draw, 40, 31 + y, 2, 3, HOODIE)
-        # Hands up
-        rect(draw, 22, 30 + y, 2, 2, SKIN)
-        rect(draw, 40, 30 + y, 2, 2, SKIN)
-    elif arms == 'typing_l':
-        # Left hand raised, right on desk
-        rect(draw, 24, 40 + y, 4, 2, HOODIE)
-        rect(draw, 36, 42 + y, 4, 2, HOODIE)
-        rect(draw, 23, 40 + y, 2, 2, SKIN)
-        rect(draw, 39, 42 + y, 2, 2, SKIN)
-    elif arms == 'typing_r':
-        # Right hand raised, left on desk
-        rect(draw, 24, 42 + y, 4, 2, HOODIE)
-        rect(draw, 36, 40 + y, 4, 2, HOODIE)
-        rect(draw, 23, 42 + y, 2, 2, SKIN)
-        rect(draw, 39, 40 + y, 2, 2, SKIN)
-    elif arms == 'slumped':
-        # Arms flat on desk (sleeping)
-        rect(draw, 22, 43 + y, 6, 2, HOODIE)
-        rect(draw, 36, 43 + y, 6, 2, HOODIE)
-        rect(draw, 21, 43 + y, 2, 2, SKIN)
-        rect(draw, 41, 43 + y, 2, 2, SKIN)
-
-
-def draw_head(draw, y_off=0, eyes='open', blink=False, look_dir=0, mouth='smile'):
+    rect(buf, 32, 37 + y, 1, 7, HOODIE_DARK)
+
+    BODY_VARIANTS[arms](buf, y)
+
+
+def _eyes_open(buf, y, look_dir):
+    # Left eye
+    px(buf, 30 + look_dir, 29 + y, EYE_WHITE)
+    px(buf, 30 + look_dir, 30 + y, EYE_PUPIL)
+    # Right eye
+    px(buf, 33 + look_dir, 29 + y, EYE_WHITE)
+    px(buf, 33 + look_dir, 30 + y, EYE_PUPIL)
+
+
+def _eyes_closed(buf, y, look_dir):
+    # Closed eyes (sleeping or blink)
+    rect(buf, 30, 30 + y, 2, 1, OUTLINE)
+    rect(buf, 33, 30 + y, 2, 1, OUTLINE)
+
+
+def _eyes_wide(buf, y, look_dir):
+    # Wide worried eyes
+    rect(buf, 30, 29 + y, 2, 1, EYE_WHITE)
+    px(buf, 30, 30 + y, EYE_PUPIL)
+    px(buf, 31, 30 + y, EYE_WHITE)
+    rect(buf, 33, 29 + y, 2, 1, EYE_WHITE)
+    px(buf, 33, 30 + y, EYE_WHITE)
+    px(buf, 34, 30 + y, EYE_PUPIL)
+
+
+def _mouth_smile(buf, y):
+    px(buf, 31, 32 + y, MOUTH)
+    px(buf, 32, 33 + y, MOUTH)
+    px(buf, 33, 32 + y, MOUTH)
+
+
+def _mouth_open(buf, y):
+    px(buf, 31, 32 + y, MOUTH)
+    px(buf, 32, 32 + y, MOUTH_DARK)
+    px(buf, 33, 32 + y, MOUTH)
+    px(buf, 32, 33 + y, MOUTH)
+
+
+def _mouth_flat(buf, y):
+    rect(buf, 31, 32 + y, 3, 1, MOUTH)
+
+
+def _mouth_none(buf, y):
+    pass  # sleeping, face hidden
+
+
+HEAD_EYES = {
+    'open': _eyes_open,
+    'closed': _eyes_closed,
+    'wide': _eyes_wide,
+}
+
+HEAD_MOUTHS = {
+    'smile': _mouth_smile,
+    'open': _mouth_open,
+    'flat': _mouth_flat,
+    'none': _mouth_none,
+}
+
+
+def draw_head(buf, y_off=0, eyes='open', blink=False, look_dir=0, mouth='smile'):
     """Draw the character's head."""
     y = y_off
 
     # Hair back
-    rect(draw, 28, 24 + y, 8, 3, HAIR)
+    rect(buf, 28, 24 + y, 8, 3, HAIR)
 
     # Face
-    rect(draw, 28, 26 + y, 8, 9, SKIN)
-    rect(draw, 29, 25 + y, 6, 1, SKIN)
+    rect(buf, 28, 26 + y, 8, 9, SKIN)
+    rect(buf, 29, 25 + y, 6, 1, SKIN)
     # Face shadow
-    rect(draw, 28, 33 + y, 8, 2, SKIN_SHADOW)
+    rect(buf, 28, 33 + y, 8, 2, SKIN_SHADOW)
 
     # Hood
-    rect(draw, 27, 24 + y, 10, 3, HOODIE)
-    rect(draw, 26, 26 + y, 2, 4, HOODIE)
-    rect(draw, 36, 26 + y, 2, 4, HOODIE)
+    rect(buf, 27, 24 + y, 10, 3, HOODIE)
+    rect(buf, 26, 26 + y, 2, 4, HOODIE)
+    rect(buf, 36, 26 + y, 2, 4, HOODIE)
     # Hood top highlight
-    rect(draw, 28, 24 + y, 8, 1, HOODIE_LIGHT)
+    rect(buf, 28, 24 + y, 8, 1, HOODIE_LIGHT)
 
     # Hair strands visible under hood
-    rect(draw, 28, 26 + y, 2, 2, HAIR)
-    rect(draw, 34, 26 + y, 2, 2, HAIR)
-
-    # Eyes
-    if eyes == 'open' and not blink:
-        # Left eye
-        px(draw, 30 + look_dir, 29 + y, EYE_WHITE)
-        px(draw, 30 + look_dir, 30 + y, EYE_PUPIL)
-        # Right eye
-        px(draw, 33 + look_dir, 29 + y, EYE_WHITE)
-        px(draw, 33 + look_dir, 30 + y, EYE_PUPIL)
-    elif eyes == 'closed' or blink:
-        # Closed eyes (sleeping or blink)
-        px(draw, 30, 30 + y, OUTLINE)
-        px(draw, 31, 30 + y, OUTLINE)
-        px(draw, 33, 30 + y, OUTLINE)
-        px(draw, 34, 30 + y, OUTLINE)
-    elif eyes == 'wide':
-        # Wide worried eyes
-        px(draw, 30, 29 + y, EYE_WHITE)
-        px(draw, 31, 29 + y, EYE_WHITE)
-        px(draw, 30, 30 + y, EYE_PUPIL)
-        px(draw, 31, 30 + y, EYE_WHITE)
-        px(draw, 33, 29 + y, EYE_WHITE)
-        px(draw, 34, 29 + y, EYE_WHITE)
-        px(draw, 33, 30 + y, EYE_WHITE)
-        px(draw, 34, 30 + y, EYE_PUPIL)
-
-    # Mouth
-    if mouth == 'smile':
-        px(draw, 31, 32 + y, MOUTH)
-        px(draw, 32, 33 + y, MOUTH)
-        px(draw, 33, 32 + y, MOUTH)
-    elif mouth == 'open':
-        px(draw, 31, 32 + y, MOUTH)
-        px(draw, 32, 32 + y, (100, 50, 40, 255))
-        px(draw, 33, 32 + y, MOUTH)
-        px(draw, 32, 33 + y, MOUTH)
-    elif mouth == 'flat':
-        px(draw, 31, 32 + y, MOUTH)
-        px(draw, 32, 32 + y, MOUTH)
-        px(draw, 33, 32 + y, MOUTH)
-    elif mouth == 'none':
-        pass  # sleeping, face hidden
-
-
-def draw_zzz(draw, frame):
+    rect(buf, 28, 26 + y, 2, 2, HAIR)
+    rect(buf, 34, 26 + y, 2, 2, HAIR)
+
+    # A blink closes any eyes
+    HEAD_EYES['closed' if blink else eyes](buf, y, look_dir)
+    HEAD_MOUTHS[mouth](buf, y)
+
+
+# Particle shapes as offsets from the particle origin
+ZZZ_DX = np.array([0, 1, 2, 2, 0, 1, 2])
+ZZZ_DY = np.array([0, 0, 0, 1, 2, 2, 2])
+SPARKLE_DX = np.array([-1, 0, 1, 0, 0])
+SPARKLE_DY = np.array([0, 0, 0, -1, 1])
+SWEAT_X = np.array([26, 38])
+SWEAT_Y = np.array([28, 27])
+SWEAT_PHASE = np.array([0, 3])
+
+
+def draw_zzz(buf, frame):
     """Draw floating Zzz particles."""
     offsets = [(36, 22), (40, 18), (44, 14)]
     sizes = [1, 1, 2]
@@ -237,181 +342,223 @@ def draw_zzz(draw, frame):
         if f < 3 + i:
             s = sizes[min(i, len(sizes) - 1)]
             alpha = max(0, 255 - f * 40)
-            color = (*ZZZ[:3], alpha)
+            color = with_alpha(ZZZ, alpha)
             # Z shape
             if s == 1:
-                px(draw, bx, by - f, color)
+                px(buf, bx, by - f, color)
             else:
-                rect(draw, bx, by - f, 3, 1, color)
-                px(draw, bx + 2, by + 1 - f, color)
-                rect(draw, bx, by + 2 - f, 3, 1, color)
+                stamp(buf, bx + ZZZ_DX, by - f + ZZZ_DY, color)
 
 
-def draw_sparkle(draw, frame):
+def draw_sparkle(buf, frame):
     """Draw celebration sparkles."""
     positions = [(18, 28), (44, 26), (22, 20), (40, 18), (32, 16)]
     for i, (sx, sy) in enumerate(positions):
         f = (frame + i * 2) % 6
         if f < 3:
             alpha = [255, 180, 100][f]
-            c = (*SPARKLE[:3], alpha)
+            c = with_alpha(SPARKLE, alpha)
             # Cross sparkle
-            px(draw, sx, sy, c)
-            px(draw, sx - 1, sy, c)
-            px(draw, sx + 1, sy, c)
-            px(draw, sx, sy - 1, c)
-            px(draw, sx, sy + 1, c)
+            stamp(buf, sx + SPARKLE_DX, sy + SPARKLE_DY, c)
 
 
-def draw_sweat(draw, frame):
+def draw_sweat(buf, frame):
     """Draw sweat drops for worried state."""
-    drops = [(26, 28), (38, 27)]
-    for i, (sx, sy) in enumerate(drops):
-        f = (frame + i * 3) % 6
-        dy = f % 3
-        if f < 4:
-            px(draw, sx, sy + dy, SWEAT)
-            if dy > 0:
-                px(draw, sx, sy + dy - 1, (*SWEAT[:3], 100))
-
-
-def draw_frame(row, col):
-    """Generate a single 64x64 frame."""
-    img = Image.new('RGBA', (W, H), TRANSPARENT)
-    draw = ImageDraw.Draw(img)
-
-    frame = col  # 0-5
-
+    f = (frame + SWEAT_PHASE) % 6
+    dy = f % 3
+    falling = f < 4
+    stamp(buf, SWEAT_X[falling], SWEAT_Y[falling] + dy[falling], SWEAT)
+    # Faint trail above drops that have started falling
+    trail = falling & (dy > 0)
+    stamp(buf, SWEAT_X[trail], SWEAT_Y[trail] + dy[trail] - 1, with_alpha(SWEAT, 100))
+
+
+def draw_background(left_glow=MONITOR_BLUE, right_glow=MONITOR_GREEN, flicker=0,
+                    monitors_on_top=False):
+    """Draw the static desk, chair and monitors into a fresh buffer.
+
+    The chair and monitors overlap by a column, so the warmup row (which
+    draws the chair first) gets its own variant.
+    """
+    buf = np.zeros((H, W), dtype=PIXEL)
+    draw_desk(buf)
+    if monitors_on_top:
+        draw_chair(buf)
+        draw_monitors(buf, left_glow, right_glow, flicker)
+    else:
+        draw_monitors(buf, left_glow, right_glow, flicker)
+        draw_chair(buf)
+    return buf
+
+
+def bg_key(left_glow=MONITOR_BLUE, right_glow=MONITOR_GREEN, flicker=0,
+           monitors_on_top=False):
+    """Return the BG_CACHE key for a furniture variant."""
+    return (left_glow, right_glow, flicker, monitors_on_top)
+
+
+def draw_head_slumped(buf):
+    """Draw the head slumped down on the desk (sleeping)."""
+    head_y = 5
+    rect(buf, 28, 30 + head_y, 8, 6, HOODIE)  # hood visible
+    rect(buf, 29, 31 + head_y, 6, 3, SKIN_SHADOW)  # side of face
+    rect(buf, 27, 29 + head_y, 10, 2, HOODIE_LIGHT)  # hood top
+
+
+def draw_warmup_glow(buf, frame):
+    """Draw the screens starting to glow while the monitors turn on."""
+    # Left monitor turning on
+    buf[33:35, 13:19] = with_alpha(MONITOR_BLUE, min(60 + (frame - 2) * 80, 200))
+
+    # Right monitor still off, first line appearing
+    if frame == 3:
+        buf[35, 42:48] = with_alpha(MONITOR_GREEN, 80)
+
+
+# Everything that varies per frame:
+#   bg      - BG_CACHE key of the furniture layer
+#   body    - (y_off, arms) passes of draw_body_sitting
+#   head    - draw_head keyword arguments, or None for the slumped head
+#   effects - fx(buf, frame) overlays drawn last
+FrameParams = namedtuple('FrameParams', 'bg body head effects')
+
+
+def _frame_params(row, frame):
+    """Work out the drawing parameters for one frame."""
     if row == 0:  # idle
         breath = [0, 0, -1, -1, 0, 0][frame]
-        blink = frame == 3
-
-        draw_desk(draw)
-        draw_monitors(draw)
-        draw_chair(draw)
-        draw_body_sitting(draw, y_off=breath, arms='desk')
+        body = ((breath, 'desk'),)
         # Mouse click on frame 2
-        arm_state = 'typing_r' if frame == 2 else 'desk'
-        if arm_state != 'desk':
-            draw_body_sitting(draw, y_off=breath, arms=arm_state)
-        draw_head(draw, y_off=breath, blink=blink, look_dir=[0, 0, 1, 0, -1, 0][frame])
+        if frame == 2:
+            body += ((breath, 'typing_r'),)
+        head = dict(y_off=breath, blink=frame == 3, look_dir=[0, 0, 1, 0, -1, 0][frame])
+        return FrameParams(bg_key(), body, head, ())
 
-    elif row == 1:  # working
-        draw_desk(draw)
+    if row == 1:  # working
         flicker = 1 if frame in [2, 5] else 0
-        draw_monitors(draw, flicker=flicker)
-        draw_chair(draw)
         arms = ['typing_l', 'typing_r', 'typing_l', 'typing_r', 'typing_l', 'typing_r'][frame]
-        draw_body_sitting(draw, arms=arms)
-        blink = frame == 4
-        draw_head(draw, blink=blink, look_dir=[0, 1, 0, -1, 0, 1][frame])
-
-    elif row == 2:  # sleeping
-        draw_desk(draw)
-        draw_monitors(draw, flicker=2)  # screens off
-        draw_chair(draw)
-        draw_body_sitting(draw, y_off=1, arms='slumped')
-        # Head slumped down on desk
-        head_y = 5
-        rect(draw, 28, 30 + head_y, 8, 6, HOODIE)  # hood visible
-        rect(draw, 29, 31 + head_y, 6, 3, SKIN_SHADOW)  # side of face
-        rect(draw, 27, 29 + head_y, 10, 2, HOODIE_LIGHT)  # hood top
-        draw_zzz(draw, frame)
-
-    elif row == 3:  # celebrating
+        head = dict(blink=frame == 4, look_dir=[0, 1, 0, -1, 0, 1][frame])
+        return FrameParams(bg_key(flicker=flicker), ((0, arms),), head, ())
+
+    if row == 2:  # sleeping
+        return FrameParams(bg_key(flicker=2),  # screens off
+                           ((1, 'slumped'),), None, (draw_zzz,))
+
+    if row == 3:  # celebrating
         breath = [0, -1, -2, -1, 0, -1][frame]
-        draw_desk(draw)
-        draw_monitors(draw, left_glow=MONITOR_GREEN, right_glow=MONITOR_GREEN)
-        draw_chair(draw)
         arms = 'up' if frame in [1, 2, 3, 4] else 'desk'
-        draw_body_sitting(draw, y_off=breath, arms=arms)
-        draw_head(draw, y_off=breath, mouth='open' if frame in [1, 2, 3] else 'smile',
-                  look_dir=[0, 0, 1, -1, 0, 0][frame])
-        draw_sparkle(draw, frame)
+        head = dict(y_off=breath, mouth='open' if frame in [1, 2, 3] else 'smile',
+                    look_dir=[0, 0, 1, -1, 0, 0][frame])
+        return FrameParams(bg_key(left_glow=MONITOR_GREEN, right_glow=MONITOR_GREEN),
+                           ((breath, arms),), head, (draw_sparkle,))
 
-    elif row == 4:  # worried
-        draw_desk(draw)
+    if row == 4:  # worried
         flicker = 1 if frame in [1, 3, 5] else 0
-        draw_monitors(draw, left_glow=MONITOR_RED, right_glow=MONITOR_RED, flicker=flicker)
-        draw_chair(draw)
         arms = ['typing_l', 'desk', 'typing_r', 'desk', 'typing_l', 'typing_r'][frame]
-        draw_body_sitting(draw, arms=arms)
-        draw_head(draw, eyes='wide', mouth='flat',
-                  look_dir=[0, 1, 1, -1, -1, 0][frame])
-        draw_sweat(draw, frame)
-
-    elif row == 5:  # warmup
-        draw_desk(draw)
-        draw_chair(draw)
-
-        if frame < 2:
-            # Monitors off
-            draw_monitors(draw, flicker=2)
-            # Stretching
-            breath = -1 if frame == 1 else 0
-            draw_body_sitting(draw, y_off=breath, arms='desk')
-            draw_head(draw, y_off=breath, eyes='closed' if frame == 0 else 'open',
-                      mouth='open' if frame == 1 else 'flat')
-        elif frame < 4:
-            # Left monitor turning on
-            rect(draw, 11, 30, 14, 12, MONITOR_FRAME)
-            rect(draw, 12, 31, 12, 10, MONITOR_SCREEN)
-            rect(draw, 16, 42, 4, 2, MONITOR_FRAME)
-            if frame >= 2:
-                # Glow starting
-                for i in range(12):
-                    alpha = 60 + (frame - 2) * 80
-                    px(draw, 13 + i % 6, 33 + i // 6, (*MONITOR_BLUE[:3], min(alpha, 200)))
-
-            # Right monitor still off
-            rect(draw, 39, 30, 14, 12, MONITOR_FRAME)
-            rect(draw, 40, 31, 12, 10, MONITOR_SCREEN)
-            rect(draw, 44, 42, 4, 2, MONITOR_FRAME)
-            if frame == 3:
-                for i in range(6):
-                    px(draw, 42 + i, 35, (*MONITOR_GREEN[:3], 80))
-
-            draw_body_sitting(draw, arms='desk')
-            draw_head(draw, look_dir=-1 if frame == 2 else 1)
-        else:
-            # Both monitors on
-            draw_monitors(draw)
-            draw_body_sitting(draw, arms='desk' if frame == 4 else 'typing_l')
-            draw_head(draw, look_dir=0, mouth='smile')
-
-    return img
+        head = dict(eyes='wide', mouth='flat', look_dir=[0, 1, 1, -1, -1, 0][frame])
+        return FrameParams(bg_key(left_glow=MONITOR_RED, right_glow=MONITOR_RED, flicker=flicker),
+                           ((0, arms),), head, (draw_sweat,))
+
+    # row 5: warmup
+    if frame < 2:
+        # Monitors off, stretching
+        breath = -1 if frame == 1 else 0
+        head = dict(y_off=breath, eyes='closed' if frame == 0 else 'open',
+                    mouth='open' if frame == 1 else 'flat')
+        return FrameParams(bg_key(flicker=2, monitors_on_top=True),
+                           ((breath, 'desk'),), head, ())
+    if frame < 4:
+        return FrameParams(bg_key(flicker=2, monitors_on_top=True),
+                           ((0, 'desk'),), dict(look_dir=-1 if frame == 2 else 1),
+                           (draw_warmup_glow,))
+    # Both monitors on
+    return FrameParams(bg_key(monitors_on_top=True),
+                       ((0, 'desk' if frame == 4 else 'typing_l'),),
+                       dict(look_dir=0, mouth='smile'), ())
+
+
+FRAME_PARAMS = [[_frame_params(row, col) for col in range(COLS)] for row in range(ROWS)]
+
+# Furniture layers for every variant the frames use; each frame starts from
+# a copy of one of these instead of redrawing the desk and monitors.
+BG_CACHE = {
+    p.bg: draw_background(*p.bg)
+    for params in FRAME_PARAMS
+    for p in params
+}
+
+
+def draw_frame_into(buf, row, col):
+    """Draw a single 64x64 frame into buf, an (H, W) view of the sheet."""
+    p = FRAME_PARAMS[row][col]
+    buf[:] = BG_CACHE[p.bg]
+    for y_off, arms in p.body:
+        draw_body_sitting(buf, y_off=y_off, arms=arms)
+    if p.head is None:
+        draw_head_slumped(buf)
+    else:
+        draw_head(buf, **p.head)
+    for fx in p.effects:
+        fx(buf, col)
 
 
 def generate_sprite_sheet():
     """Generate the full 384x384 sprite sheet."""
-    sheet = Image.new('RGBA', (SHEET_W, SHEET_H), TRANSPARENT)
+    canvas = np.zeros((SHEET_H, SHEET_W), dtype=PIXEL)
 
     for row in range(ROWS):
         for col in range(COLS):
-            frame = draw_frame(row, col)
-            sheet.paste(frame, (col * W, row * H))
+            draw_frame_into(canvas[row * H:(row + 1) * H, col * W:(col + 1) * W], row, col)
+
+    # Wrap the packed pixels as an RGBA image without copying them
+    return Image.frombuffer('RGBA', (SHEET_W, SHEET_H), canvas, 'raw', 'RGBA', 0, 1)
 
-    return sheet
+
+def source_hash():
+    """Hash the generator source; the outputs are a pure function of it."""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def is_up_to_date(paths, hash_path, digest):
+    """Check that all outputs exist and were built from this source."""
+    if not all(os.path.exists(p) for p in paths + [hash_path]):
+        return False
+    with open(hash_path) as f:
+        return f.read().strip() == digest
 
 
 if __name__ == '__main__':
+    out_path = os.path.join(os.path.dirname(__file__), 'sprite-sheet.png')
+    b64_path = os.path.join(os.path.dirname(__file__), 'sprite-base64.txt')
+    hash_path = out_path + '.hash'
+
+    # Skip regeneration when the outputs match this source (--force rebuilds)
+    digest = source_hash()
+    if '--force' not in sys.argv and is_up_to_date([out_path, b64_path], hash_path, digest):
+        print(f"Sprite sheet up to date: {out_path}")
+        sys.exit(0)
+
     sheet = generate_sprite_sheet()
 
-    # Save as PNG file
-    out_path = os.path.join(os.path.dirname(__file__), 'sprite-sheet.png')
-    sheet.save(out_path, 'PNG', optimize=True)
+    # Encode the PNG once and reuse the bytes for the file and base64
+    png = io.BytesIO()
+    sheet.save(png, 'PNG', optimize=True)
+    data = png.getvalue()
 
-    # Also output base64
-    import io
-    buf = io.BytesIO()
-    sheet.save(buf, 'PNG', optimize=True)
-    b64 = base64.b64encode(buf.getvalue()).decode('ascii')
+    with open(out_path, 'wb') as f:
+        f.write(data)
+
+    b64 = base64.b64encode(data).decode('ascii')
 
-    b64_path = os.path.join(os.path.dirname(__file__), 'sprite-base64.txt')
     with open(b64_path, 'w') as f:
         f.write(b64)
 
+    # Written last so an interrupted run is regenerated next time
+    with open(hash_path, 'w') as f:
+        f.write(digest)
+
     print(f"Sprite sheet saved to {out_path}")
     print(f"Base64 saved to {b64_path}")
-    print(f"PNG size: {buf.tell()} bytes")
+    print(f"PNG size: {len(data)} bytes")
     print(f"Base64 length: {len(b64)} chars")